@@ -0,0 +1,153 @@
+// lib/dashboardCache.js
+
+const crypto = require('crypto');
+
+// Each company holds up to three entries (details, dashboard summary and P&L),
+// so the default keeps roughly 66 companies' dashboards warm.
+const MAX_ENTRIES = parseInt(process.env.DASHBOARD_CACHE_MAX_ENTRIES, 10) || 200;
+
+// Distinguishes ETags issued by this process from ones issued before a restart,
+// since sync generations are kept in memory and start again from zero.
+const bootId = crypto.randomBytes(4).toString('hex');
+
+const generations = new Map();
+const entries = new Map(); // insertion order doubles as LRU order
+const inFlight = new Map();
+
+/**
+ * Returns the current sync generation for a company file.
+ */
+function getGeneration(companyFileId) {
+    return generations.get(companyFileId) || 0;
+}
+
+/**
+ * Marks every cached payload for a company file as stale. Call this whenever
+ * a sync for that company finishes writing to the database.
+ */
+function bumpGeneration(companyFileId) {
+    const next = getGeneration(companyFileId) + 1;
+    generations.set(companyFileId, next);
+    for (const key of entries.keys()) {
+        if (key.startsWith(`${companyFileId}|`)) {
+            entries.delete(key);
+        }
+    }
+    return next;
+}
+
+/**
+ * Returns the reporting dates used by the dashboard figures, all taken from the
+ * server's local calendar. `day` identifies the calendar day the other dates
+ * were derived from, so it is also part of every cache key and ETag.
+ */
+function getReportingDates(now = new Date()) {
+    const pad = (n) => String(n).padStart(2, '0');
+    const fyStartYear = now.getMonth() >= 6 ? now.getFullYear() : now.getFullYear() - 1;
+    const threeMonthsAgo = new Date(now);
+    threeMonthsAgo.setMonth(now.getMonth() - 3);
+
+    return {
+        day: `${now.getFullYear()}-${pad(now.getMonth() + 1)}-${pad(now.getDate())}`,
+        fyStartDate: new Date(fyStartYear, 6, 1),
+        threeMonthsAgo
+    };
+}
+
+/**
+ * Builds the cache key and ETag for a company file resource on a given reporting day.
+ */
+function getVersion(companyFileId, resource, dates) {
+    const generation = getGeneration(companyFileId);
+    return {
+        key: `${companyFileId}|${resource}|${generation}|${dates.day}`,
+        etag: `"${resource}-${bootId}-${generation}-${dates.day}"`
+    };
+}
+
+/**
+ * Returns the cached payload for `key`, calling `loader` on a miss. Concurrent
+ * misses for the same key share a single `loader` call. Failed loads are not cached.
+ */
+async function getOrLoad(companyFileId, key, loader) {
+    if (entries.has(key)) {
+        const value = entries.get(key);
+        entries.delete(key);
+        entries.set(key, value);
+        return value;
+    }
+
+    if (inFlight.has(key)) {
+        return inFlight.get(key);
+    }
+
+    const generation = getGeneration(companyFileId);
+    const pending = (async () => {
+        try {
+            const value = await loader();
+            // Skip storing results that were computed across a sync completing.
+            if (getGeneration(companyFileId) === generation) {
+                entries.set(key, value);
+                if (entries.size > MAX_ENTRIES) {
+                    entries.delete(entries.keys().next().value);
+                }
+            }
+            return value;
+        } finally {
+            inFlight.delete(key);
+        }
+    })();
+
+    inFlight.set(key, pending);
+    return pending;
+}
+
+/**
+ * Returns the cached payload for a company file resource, calling
+ * `loader(dates)` on a miss.
+ */
+function loadCached(companyFileId, resource, dates, loader) {
+    return getOrLoad(companyFileId, getVersion(companyFileId, resource, dates).key, () => loader(dates));
+}
+
+/**
+ * Sends the JSON payload built by `build(dates)` under a generation-based ETag,
+ * answering with 304 Not Modified when the client already holds the current
+ * version. The payload itself is not cached; use `sendCached` for that.
+ */
+async function sendVersioned(req, res, companyFileId, resource, build) {
+    const dates = getReportingDates();
+    const { etag } = getVersion(companyFileId, resource, dates);
+    const ifNoneMatch = req.get('If-None-Match');
+
+    if (ifNoneMatch && ifNoneMatch.split(',').some(tag => tag.trim() === etag)) {
+        res.set('ETag', etag);
+        res.set('Cache-Control', 'private, no-cache');
+        return res.status(304).end();
+    }
+
+    // Headers are only set once the payload has loaded so that error
+    // responses never carry a success ETag.
+    const payload = await build(dates);
+    res.set('ETag', etag);
+    res.set('Cache-Control', 'private, no-cache');
+    res.json(payload);
+}
+
+/**
+ * Sends a cached JSON payload for a company file resource, answering with
+ * 304 Not Modified when the client already holds the current version.
+ */
+function sendCached(req, res, companyFileId, resource, loader) {
+    return sendVersioned(req, res, companyFileId, resource,
+        (dates) => loadCached(companyFileId, resource, dates, loader));
+}
+
+module.exports = {
+    getGeneration,
+    bumpGeneration,
+    getReportingDates,
+    loadCached,
+    sendVersioned,
+    sendCached,
+};
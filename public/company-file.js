@@ -521,28 +521,20 @@ document.addEventListener('DOMContentLoaded', async () => {
             // Initialize charts first
             initializeCharts();
 
-            const [companyDetailsRes, dashboardDataRes, pnlRes] = await Promise.all([
-                errorHandler.fetch(`/api/company/${companyId}`, { 
-                    context: 'Fetching company details',
-                    timeout: 15000 
-                }),
-                errorHandler.fetch(`/api/company/${companyId}/dashboard-summary`, { 
-                    context: 'Fetching dashboard data',
-                    timeout: 15000 
-                }),
-                errorHandler.fetch(`/api/company/${companyId}/profit-and-loss`, { 
-                    context: 'Fetching profit & loss data',
-                    timeout: 15000 
-                })
-            ]);
+            const dashboardRes = await errorHandler.fetch(`/api/company/${companyId}/dashboard`, {
+                context: 'Fetching dashboard data',
+                timeout: 15000
+            });
 
-            if (!companyDetailsRes.ok || !dashboardDataRes.ok || !pnlRes.ok) {
+            if (!dashboardRes.ok) {
                 throw new Error(`Failed to fetch required dashboard data from the server.`);
             }
 
-            const companyDetails = await companyDetailsRes.json();
-            const dashboardData = await dashboardDataRes.json();
-            const pnlData = await pnlRes.json();
+            const {
+                company: companyDetails,
+                summary: dashboardData,
+                profit_and_loss: pnlData
+            } = await dashboardRes.json();
 
             companyNameEl.textContent = companyDetails.name || 'Company Dashboard';
             
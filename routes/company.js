@@ -5,6 +5,7 @@ const asyncHandler = require('../middleware/asyncHandler');
 const { requireToken } = require('../middleware/tokenValidation');
 const { requireSessionAuth } = require('../middleware/sessionAuth');
 const { NotFoundError, BadRequestError } = require('../lib/errors');
+const { loadCached, sendCached, sendVersioned } = require('../lib/dashboardCache');
 const querystring = require('querystring');
 
 const router = express.Router();
@@ -87,19 +88,20 @@ router.get('/files', asyncHandler(async (req, res, next) => {
     res.json(finalRows);
 }));
 
-// Get details for a specific company file
-router.get('/:id', asyncHandler(async (req, res, next) => {
-    const { id } = req.params;
+/**
+ * Loads a company file record, falling back to MYOB when it is not yet stored locally.
+ */
+const loadCompanyDetails = async (id) => {
     const { rows } = await query('SELECT * FROM company_files WHERE myob_uid = $1', [id]);
     if (rows.length > 0) {
-        return res.json(rows[0]);
+        return rows[0];
     }
 
     const data = await makeMyobApiRequest('https://api.myob.com/accountright/');
     const companyFile = data.find(f => f.Id === id);
     
     if (!companyFile) {
-        return next(new NotFoundError('Company file not found.'));
+        throw new NotFoundError('Company file not found.');
     }
 
     await query(
@@ -107,21 +109,14 @@ router.get('/:id', asyncHandler(async (req, res, next) => {
         [companyFile.Id, companyFile.Name, companyFile.Uri, companyFile.Country]
     );
     const { rows: finalRows } = await query('SELECT * FROM company_files WHERE myob_uid = $1', [id]);
-    res.json(finalRows[0]);
-}));
-
-
-// Get dashboard summary
-router.get('/:id/dashboard-summary', asyncHandler(async (req, res) => {
-    const { id } = req.params;
-    const today = new Date();
-    const currentMonth = today.getMonth();
-    const currentYear = today.getFullYear();
-    const fyStartYear = currentMonth >= 6 ? currentYear : currentYear - 1;
-    const fyStartDate = new Date(fyStartYear, 6, 1);
-    const threeMonthsAgo = new Date();
-    threeMonthsAgo.setMonth(today.getMonth() - 3);
-
+    return finalRows[0];
+};
+
+/**
+ * Calculates the dashboard summary figures for a company file as of the given
+ * reporting dates.
+ */
+const loadDashboardSummary = async (id, { fyStartDate, threeMonthsAgo }) => {
     const queries = {
         overdueInvoices: `SELECT COUNT(*)::int as count, COALESCE(SUM(COALESCE(balance_due_amount, amount_total - amount_paid)), 0) as total FROM invoices WHERE company_id = $1 AND due_date < NOW() AND COALESCE(balance_due_amount, amount_total - amount_paid) > 0`,
         overdueBills: `SELECT COUNT(*)::int as count, COALESCE(SUM(COALESCE(balance_due_amount, amount)), 0) as total FROM bills WHERE company_id = $1 AND due_date < NOW()`,
@@ -160,7 +155,7 @@ router.get('/:id/dashboard-summary', asyncHandler(async (req, res) => {
     const gstPaidForDisplay = Math.abs(gstPaidRaw);
     const gstToPay = gstCollected - gstPaidForDisplay;
 
-    res.json({
+    return {
         overdue_invoices: {
             count: parseInt(overdueInvoicesRes.rows[0]?.count) || 0,
             total: parseFloat(overdueInvoicesRes.rows[0]?.total) || 0
@@ -178,17 +173,49 @@ router.get('/:id/dashboard-summary', asyncHandler(async (req, res) => {
             paid: gstPaidForDisplay,
             to_pay: gstToPay
         },
-    });
-}));
+    };
+};
 
-// Get P&L report
-router.get('/:id/profit-and-loss', asyncHandler(async (req, res, next) => {
-    const { id } = req.params;
+/**
+ * Loads the most recent stored Profit and Loss report for a company file.
+ */
+const loadProfitAndLoss = async (id) => {
     const { rows } = await query('SELECT raw_data FROM profit_and_loss_reports WHERE company_file_id = $1 ORDER BY report_year DESC, report_month DESC LIMIT 1', [id]);
     if (rows.length === 0) {
-        return next(new NotFoundError('Profit and Loss report not found. Please sync first.'));
+        throw new NotFoundError('Profit and Loss report not found. Please sync first.');
     }
-    res.json(rows[0].raw_data);
+    return rows[0].raw_data;
+};
+
+// Get details for a specific company file
+router.get('/:id', asyncHandler(async (req, res) => {
+    const { id } = req.params;
+    await sendCached(req, res, id, 'details', () => loadCompanyDetails(id));
+}));
+
+// Get dashboard summary
+router.get('/:id/dashboard-summary', asyncHandler(async (req, res) => {
+    const { id } = req.params;
+    await sendCached(req, res, id, 'dashboard-summary', (dates) => loadDashboardSummary(id, dates));
+}));
+
+// Get P&L report
+router.get('/:id/profit-and-loss', asyncHandler(async (req, res) => {
+    const { id } = req.params;
+    await sendCached(req, res, id, 'profit-and-loss', () => loadProfitAndLoss(id));
+}));
+
+// Get company details, dashboard summary and P&L report in a single request
+router.get('/:id/dashboard', asyncHandler(async (req, res) => {
+    const { id } = req.params;
+    await sendVersioned(req, res, id, 'dashboard', async (dates) => {
+        const [company, summary, profitAndLoss] = await Promise.all([
+            loadCached(id, 'details', dates, () => loadCompanyDetails(id)),
+            loadCached(id, 'dashboard-summary', dates, () => loadDashboardSummary(id, dates)),
+            loadCached(id, 'profit-and-loss', dates, () => loadProfitAndLoss(id))
+        ]);
+        return { company, summary, profit_and_loss: profitAndLoss };
+    });
 }));
 
 // Generic resource fetcher
@@ -9,6 +9,7 @@ const myobAdapter = require('../myobAdapter');
 const vector = require('../vector');
 const { requireSessionAuth } = require('../middleware/sessionAuth');
 const { ensureFreshToken } = require('../middleware/tokenRefresh');
+const { bumpGeneration } = require('../lib/dashboardCache');
 
 // Require session authentication for all sync routes
 router.use(requireSessionAuth);
@@ -243,6 +244,7 @@ router.post('/:companyFileId', asyncHandler(async (req, res, next) => {
           last_updated = CURRENT_TIMESTAMP
       WHERE company_file_id = $1
     `, [companyFileId, processed]);
+    bumpGeneration(companyFileId);
 
     console.log(`✅ Sync completed: ${processed} items processed`);
     res.json({ 
@@ -254,6 +256,9 @@ router.post('/:companyFileId', asyncHandler(async (req, res, next) => {
 
   } catch (err) {
     console.error('❌ Sync Error:', err.response?.data || err.message);
+
+    // Items stored before the failure still change the dashboard figures
+    bumpGeneration(companyFileId);
     
     // Update progress with error
     await query(`